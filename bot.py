@@ -1,19 +1,27 @@
 import asyncio
 import logging
 import os
-import json
 import random
 import time
-from datetime import datetime, timedelta
+from collections import Counter
 from typing import Dict, List, Optional, Tuple
 import asyncpg
 import aiohttp
+import orjson
+import uvloop
+from cachetools import TTLCache
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
-    Application, CommandHandler, CallbackQueryHandler, 
+    Application, CallbackQueryHandler,
     ContextTypes, MessageHandler, filters
 )
 
+from config import ADMIN_IDS
+
+# libuv-backed event loop: cheaper dispatch for every await in the bot.
+# Installed at import time so every loop the process creates picks it up.
+uvloop.install()
+
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -29,7 +37,12 @@ COINGECKO_API = "https://api.coingecko.com/api/v3"
 # Global variables
 price_cache = {}
 last_price_update = 0
-user_cooldowns = {}
+# Cooldown entries expire on their own, so the cache stays bounded no matter
+# how many users pass through
+user_cooldowns = TTLCache(maxsize=100_000, ttl=10)
+_price_lock = asyncio.Lock()
+# One shared generator (urandom-seeded) instead of the module-global functions
+_rng = random.Random()
 
 # Supported coins
 SUPPORTED_COINS = {
@@ -45,20 +58,269 @@ SUPPORTED_COINS = {
     'ATOM': 'cosmos'
 }
 
+# Derived lookups, built once at import time so the refresh path does no joins
+_ID_TO_SYMBOL = {coin_id: symbol for symbol, coin_id in SUPPORTED_COINS.items()}
+_COIN_IDS_CSV = ','.join(SUPPORTED_COINS.values())
+_COINGECKO_PRICE_URL = f"{COINGECKO_API}/simple/price?ids={_COIN_IDS_CSV}&vs_currencies=usd"
+
+# Binance pushes price updates over one WebSocket, replacing the polling loop
+_BINANCE_TO_SYMBOL = {f"{symbol}USDT": symbol for symbol in SUPPORTED_COINS}
+_BINANCE_WS_URL = "wss://stream.binance.com:9443/stream?streams=" + '/'.join(
+    f"{symbol.lower()}usdt@miniTicker" for symbol in SUPPORTED_COINS
+)
+
+# Reply templates, built once at import time; handlers only .format() them
+INVALID_AMOUNT_MSG = "❌ Invalid amount!"
+POSITIVE_BET_MSG = "❌ Bet amount must be positive!"
+PRICE_UNAVAILABLE_MSG = "❌ Price data unavailable. Try again later!"
+UNSUPPORTED_COIN_MSG = f"❌ Unsupported coin! Available: {', '.join(SUPPORTED_COINS)}"
+INSUFFICIENT_FUNDS_TMPL = "❌ Insufficient funds! You have ${balance:,.2f}"
+
+BUY_SUCCESS_TMPL = """
+✅ **Purchase Successful!** ✅
+
+💰 Bought: {crypto_amount:.6f} {coin}
+💵 Spent: ${amount:,.2f}
+📊 Price: ${price:,.2f}
+💳 Remaining Balance: ${new_balance:,.2f}
+
+{quip}
+        """
+
+SELL_SUCCESS_TMPL = """
+✅ **Sale Successful!** ✅
+
+💎 Sold: {crypto_amount:.6f} {coin}
+💵 Received: ${sale_value:,.2f}
+📊 Price: ${price:,.2f}
+💳 New Balance: ${new_balance:,.2f}
+
+{quip}
+        """
+
+COINFLIP_TMPL = """
+🪙 **COIN FLIP** 🪙
+
+💰 Bet: ${bet_amount:,.2f}
+{result_msg}
+💳 New Balance: ${new_balance:,.2f}
+
+{quip}
+        """
+
+SLOTS_TMPL = """
+🎰 **SLOT MACHINE** 🎰
+
+{reel1} | {reel2} | {reel3}
+
+💰 Bet: ${bet_amount:,.2f}
+{result_msg}
+💳 New Balance: ${new_balance:,.2f}
+
+{quip}
+        """
+
+ROLL_TMPL = """
+🎲 **DICE ROLL** 🎲
+
+🎯 Roll: {roll}/100
+💰 Bet: ${bet_amount:,.2f}
+{result_msg}
+💳 New Balance: ${new_balance:,.2f}
+
+{quip}
+        """
+
+PREDICTION_ACTIVE_TMPL = """
+🔮 **PRICE PREDICTION ACTIVE** 🔮
+
+💰 Coin: {coin}
+📊 Current Price: ${start_price:,.2f}
+🎯 Prediction: {direction}
+💵 Bet: ${bet_amount:,.2f}
+
+⏰ The result will be posted here in 5 minutes!
+
+Fortune favors the bold... or does it? 🤔
+        """
+
+PREDICTION_WON_TMPL = """
+🎉 **PREDICTION WON!** 🎉
+
+💰 {coin}: ${start_price:,.2f} → ${end_price:,.2f}
+📈 Change: {change_sign}${price_change:,.2f}
+🎯 Your Prediction: {direction} ✅
+💵 Winnings: ${payout:,.2f}
+💳 New Balance: ${new_balance:,.2f}
+
+You're either psychic or lucky! 🔮
+                """
+
+PREDICTION_LOST_TMPL = """
+💸 **PREDICTION LOST** 💸
+
+💰 {coin}: ${start_price:,.2f} → ${end_price:,.2f}
+📉 Change: {change_sign}${price_change:,.2f}
+🎯 Your Prediction: {direction} ❌
+💸 Lost: ${bet_amount:,.2f}
+
+The market is a harsh teacher! 📚
+                """
+
+PREDICTION_REFUND_TMPL = (
+    "🔮 Prediction refunded due to price data unavailability. ${bet_amount:,.2f} returned."
+)
+
+LEADERBOARD_HEADER = "🏆 **TOP FAKE CRYPTO MILLIONAIRES** 🏆\n\n"
+LEADERBOARD_FOOTER = "💡 Rankings update in real-time!"
+RANK_LABELS = ("🥇", "🥈", "🥉", "4.", "5.", "6.", "7.", "8.", "9.", "10.")
+TRADE_EMOJI = {'BUY': '📈 Bought', 'SELL': '📉 Sold'}
+
+HELP_TEXT = """
+🎮 **Fake Crypto World Commands** 🎮
+
+**📈 Trading:**
+/prices - Current market prices
+/buy <COIN> <AMOUNT> - Buy crypto (e.g., /buy BTC 1000)
+/sell <COIN> - Sell all of a coin (e.g., /sell ETH)
+/portfolio - View your holdings
+
+**🎲 Gambling:**
+/coinflip <AMOUNT> - 50/50 chance, double or nothing
+/slots <AMOUNT> - 3-reel slot machine
+/predict <COIN> <UP/DOWN> <AMOUNT> - Predict price in 5min
+/roll <AMOUNT> - Roll 1-100, higher = better rewards
+
+**📊 Stats:**
+/leaderboard - Top 10 players by net worth
+/help - Show this message
+
+**💰 Supported Coins:**
+BTC, ETH, SOL, ADA, DOT, AVAX, MATIC, LINK, UNI, ATOM
+
+**🎯 Gambling Payouts:**
+• Coin Flip: 2x (50% chance)
+• Slots: 2x-50x depending on match
+• Prediction: 2x if correct
+• Dice: 2x-10x based on roll (50+ to win)
+
+Remember: All money is FAKE! Trade responsibly! 😄
+        """
+
 class DatabaseManager:
+    _GET_USER_SQL = "SELECT * FROM users WHERE user_id = $1"
+    _CREATE_USER_SQL = "INSERT INTO users (user_id) VALUES ($1)"
+    _GET_BALANCE_SQL = """INSERT INTO users (user_id) VALUES ($1)
+                          ON CONFLICT (user_id) DO UPDATE SET last_active = NOW()
+                          RETURNING balance"""
+    _ADJUST_BALANCE_SQL = """UPDATE users
+                             SET balance = balance + $2, last_active = NOW()
+                             WHERE user_id = $1 AND balance >= $3
+                             RETURNING balance"""
+    _ADD_TRADE_SQL = """INSERT INTO trades (user_id, coin, trade_type, amount, price, total_value)
+                        VALUES ($1, $2, $3, $4, $5, $6)"""
+    _ADD_PREDICTION_SQL = """INSERT INTO predictions (user_id, chat_id, coin, direction,
+                                                      bet_amount, start_price, end_time)
+                             VALUES ($1, $2, $3, $4, $5, $6, NOW() + interval '5 minutes')
+                             RETURNING id"""
+    _DUE_PREDICTIONS_SQL = """SELECT id, user_id, chat_id, coin, direction, bet_amount, start_price
+                              FROM predictions
+                              WHERE result IS NULL AND end_time <= NOW()
+                              FOR UPDATE SKIP LOCKED"""
+    _CREDIT_PAYOUTS_SQL = """UPDATE users SET balance = balance + v.payout
+                             FROM (SELECT unnest($1::bigint[]) AS user_id,
+                                          unnest($2::float8[]) AS payout) v
+                             WHERE users.user_id = v.user_id
+                             RETURNING users.user_id, users.balance"""
+    _SETTLE_PREDICTIONS_SQL = """UPDATE predictions AS p
+                                 SET result = v.result, end_price = v.end_price, payout = v.payout
+                                 FROM (SELECT unnest($1::int[]) AS id,
+                                              unnest($2::text[]) AS result,
+                                              unnest($3::float8[]) AS end_price,
+                                              unnest($4::float8[]) AS payout) v
+                                 WHERE p.id = v.id"""
+    _RECENT_TRADES_SQL = """SELECT trade_type, amount, coin, price FROM trades
+                            WHERE user_id = $1
+                            ORDER BY timestamp DESC LIMIT 5"""
+    _ADMIN_STATS_SQL = """
+        SELECT (SELECT COUNT(*) FROM users) AS total_users,
+               (SELECT COUNT(*) FROM trades) AS total_trades,
+               (SELECT COUNT(*) FROM (SELECT 1 FROM trades
+                                      WHERE timestamp > NOW() - INTERVAL '24 hours'
+                                      GROUP BY user_id) t) AS active_users,
+               (SELECT SUM(balance) FROM users) AS total_balance
+    """
+    # Variant used when postgresql-hll is available: the 24h active-user
+    # count becomes an O(1) cardinality read over per-minute sketches
+    _ADMIN_STATS_HLL_SQL = """
+        SELECT (SELECT COUNT(*) FROM users) AS total_users,
+               (SELECT COUNT(*) FROM trades) AS total_trades,
+               (SELECT COALESCE(hll_cardinality(hll_union_agg(sketch)), 0)::bigint
+                FROM trade_hll
+                WHERE bucket > NOW() - INTERVAL '24 hours') AS active_users,
+               (SELECT SUM(balance) FROM users) AS total_balance
+    """
+    _HLL_RECORD_SQL = """INSERT INTO trade_hll (bucket, sketch)
+                         SELECT date_trunc('minute', NOW()),
+                                hll_add_agg(hll_hash_bigint(v.user_id))
+                         FROM unnest($1::bigint[]) AS v(user_id)
+                         ON CONFLICT (bucket) DO UPDATE
+                         SET sketch = hll_union(trade_hll.sketch, EXCLUDED.sketch)"""
+    # Filled in with a VALUES list of (coin, price) pairs from the price cache,
+    # so portfolio valuation happens server-side in one aggregation
+    _LEADERBOARD_SQL_TMPL = """
+        SELECT u.user_id, u.balance, u.total_trades,
+               COALESCE(SUM((p.amount)::float8 * pr.price), 0) AS portfolio_value,
+               u.balance + COALESCE(SUM((p.amount)::float8 * pr.price), 0) AS total_value
+        FROM users u
+        LEFT JOIN LATERAL jsonb_each_text(u.portfolio) AS p(coin, amount) ON true
+        LEFT JOIN (VALUES {values}) AS pr(coin, price) ON pr.coin = p.coin
+        GROUP BY u.user_id
+        ORDER BY total_value DESC
+        LIMIT $1
+    """
+
+    # Single-user variant of the leaderboard valuation: the portfolio is
+    # multiplied and summed server-side instead of looping over the dict in
+    # the handler
+    _USER_STATS_SQL_TMPL = """
+        SELECT u.balance, u.total_trades, u.join_date,
+               COALESCE(SUM((p.amount)::float8 * pr.price), 0) AS portfolio_value
+        FROM users u
+        LEFT JOIN LATERAL jsonb_each_text(u.portfolio) AS p(coin, amount) ON true
+        LEFT JOIN (VALUES {values}) AS pr(coin, price) ON pr.coin = p.coin
+        WHERE u.user_id = $1
+        GROUP BY u.user_id
+    """
+
     def __init__(self):
         self.pool = None
-    
+        self._trade_queue = asyncio.Queue()
+        self._flusher_task = None
+        self._hll_enabled = False
+
     async def init_db(self):
         """Initialize database connection and create tables"""
-        self.pool = await asyncpg.create_pool(DATABASE_URL)
-        
+        # min_size keeps a warm floor for steady traffic, max_size absorbs
+        # command bursts, and idle connections above the floor close after
+        # five quiet minutes
+        self.pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            min_size=5,
+            max_size=20,
+            max_inactive_connection_lifetime=300,
+            command_timeout=10,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
+            init=self._init_connection
+        )
+
         async with self.pool.acquire() as conn:
             # Users table
             await conn.execute('''
                 CREATE TABLE IF NOT EXISTS users (
                     user_id BIGINT PRIMARY KEY,
-                    balance DECIMAL(15,2) DEFAULT 10000.00,
+                    balance DOUBLE PRECISION DEFAULT 10000.00,
                     portfolio JSONB DEFAULT '{}',
                     total_trades INTEGER DEFAULT 0,
                     join_date TIMESTAMP DEFAULT NOW(),
@@ -73,9 +335,9 @@ class DatabaseManager:
                     user_id BIGINT,
                     coin VARCHAR(10),
                     trade_type VARCHAR(4),
-                    amount DECIMAL(15,8),
-                    price DECIMAL(15,2),
-                    total_value DECIMAL(15,2),
+                    amount DOUBLE PRECISION,
+                    price DOUBLE PRECISION,
+                    total_value DOUBLE PRECISION,
                     timestamp TIMESTAMP DEFAULT NOW()
                 )
             ''')
@@ -85,18 +347,25 @@ class DatabaseManager:
                 CREATE TABLE IF NOT EXISTS predictions (
                     id SERIAL PRIMARY KEY,
                     user_id BIGINT,
+                    chat_id BIGINT,
                     coin VARCHAR(10),
                     direction VARCHAR(4),
-                    bet_amount DECIMAL(15,2),
-                    start_price DECIMAL(15,2),
-                    end_price DECIMAL(15,2),
+                    bet_amount DOUBLE PRECISION,
+                    start_price DOUBLE PRECISION,
+                    end_price DOUBLE PRECISION,
                     start_time TIMESTAMP DEFAULT NOW(),
                     end_time TIMESTAMP,
                     result VARCHAR(10),
-                    payout DECIMAL(15,2)
+                    payout DOUBLE PRECISION
                 )
             ''')
-            
+
+            # Databases created before chat_id existed get it here, since
+            # CREATE TABLE IF NOT EXISTS never touches an existing table
+            await conn.execute('''
+                ALTER TABLE predictions ADD COLUMN IF NOT EXISTS chat_id BIGINT
+            ''')
+
             # Daily missions table
             await conn.execute('''
                 CREATE TABLE IF NOT EXISTS daily_missions (
@@ -107,83 +376,323 @@ class DatabaseManager:
                     target INTEGER,
                     completed BOOLEAN DEFAULT FALSE,
                     date DATE DEFAULT CURRENT_DATE,
-                    reward DECIMAL(15,2)
+                    reward DOUBLE PRECISION
                 )
             ''')
 
+            # Leaderboard reads become an index scan instead of a full sort
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS users_balance_desc_idx
+                ON users (balance DESC) INCLUDE (user_id, portfolio, total_trades)
+            ''')
+
+            # Serves the /stats recent-trades LIMIT straight off the index,
+            # newest first, with no sort step
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS trades_user_ts
+                ON trades (user_id, timestamp DESC)
+            ''')
+
+            # The settle job only ever touches unresolved, due predictions
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS predictions_due_idx
+                ON predictions (end_time) WHERE result IS NULL
+            ''')
+
+            # Optional: with postgresql-hll installed, active-user counts come
+            # from per-minute cardinality sketches instead of scanning trades
+            try:
+                await conn.execute("CREATE EXTENSION IF NOT EXISTS hll")
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS trade_hll (
+                        bucket TIMESTAMPTZ PRIMARY KEY,
+                        sketch hll NOT NULL
+                    )
+                ''')
+                self._hll_enabled = True
+            except asyncpg.PostgresError:
+                logger.info(
+                    "postgresql-hll not available; "
+                    "admin stats will count active users from trades"
+                )
+
+        self._flusher_task = asyncio.create_task(self._trade_flusher())
+
+    async def _init_connection(self, conn):
+        """Per-connection setup: type codecs
+
+        With the codec registered, jsonb columns travel as Python dicts and the
+        (de)serialization happens inside the driver instead of in every handler.
+        Statement reuse needs no setup here: the pool's statement cache keeps
+        every hot query prepared after its first run on a connection.
+        """
+        await conn.set_type_codec(
+            'jsonb', encoder=lambda v: orjson.dumps(v).decode(), decoder=orjson.loads,
+            schema='pg_catalog', format='text'
+        )
+        # Money columns are double precision, but anything that still comes
+        # back as numeric (casts, future aggregates) should be a plain float
+        # rather than a Decimal — fake money doesn't need exact arithmetic
+        await conn.set_type_codec(
+            'numeric', encoder=str, decoder=float,
+            schema='pg_catalog', format='text'
+        )
+
     async def get_user(self, user_id: int) -> Dict:
         """Get user data or create new user"""
         async with self.pool.acquire() as conn:
-            user = await conn.fetchrow(
-                "SELECT * FROM users WHERE user_id = $1", user_id
-            )
-            
+            user = await conn.fetchrow(self._GET_USER_SQL, user_id)
+
             if not user:
-                await conn.execute(
-                    "INSERT INTO users (user_id) VALUES ($1)", user_id
-                )
-                user = await conn.fetchrow(
-                    "SELECT * FROM users WHERE user_id = $1", user_id
-                )
-            
+                await conn.execute(self._CREATE_USER_SQL, user_id)
+                user = await conn.fetchrow(self._GET_USER_SQL, user_id)
+
             return dict(user)
 
-    async def update_balance(self, user_id: int, new_balance: float):
-        """Update user balance"""
-        async with self.pool.acquire() as conn:
-            await conn.execute(
-                "UPDATE users SET balance = $1, last_active = NOW() WHERE user_id = $2",
-                new_balance, user_id
-            )
+    async def get_balance(self, user_id: int) -> float:
+        """Get the user's cash balance, creating the user row if needed
+
+        Fetches only the balance column — no portfolio jsonb travels over the
+        wire — and folds the create-if-missing upsert into the same statement.
+        """
+        return await self.pool.fetchval(self._GET_BALANCE_SQL, user_id)
 
-    async def update_portfolio(self, user_id: int, portfolio: Dict):
-        """Update user portfolio"""
+    async def adjust_balance(self, user_id: int, delta: float,
+                             stake: float = 0.0) -> Optional[float]:
+        """Atomically apply a balance delta, requiring the balance to cover `stake`
+
+        Returns the new balance, or None on insufficient funds. One statement
+        replaces the read/compute/write pair and closes the race between the
+        balance check and the update.
+        """
         async with self.pool.acquire() as conn:
-            await conn.execute(
-                "UPDATE users SET portfolio = $1, last_active = NOW() WHERE user_id = $2",
-                json.dumps(portfolio), user_id
-            )
+            new_balance = await conn.fetchval(self._ADJUST_BALANCE_SQL, user_id, delta, stake)
+            if new_balance is None:
+                # The row may simply not exist yet: upsert it, then retry once
+                await conn.fetchval(self._GET_BALANCE_SQL, user_id)
+                new_balance = await conn.fetchval(self._ADJUST_BALANCE_SQL, user_id, delta, stake)
+        return new_balance
+
+    _APPLY_TRADE_BUY_SQL = '''
+        UPDATE users
+        SET balance = balance - $4,
+            portfolio = jsonb_set(
+                COALESCE(portfolio, '{}'::jsonb), ARRAY[$2],
+                to_jsonb(COALESCE((portfolio->>$2)::numeric, 0) + $3)
+            ),
+            last_active = NOW()
+        WHERE user_id = $1 AND balance >= $4
+        RETURNING balance, portfolio
+    '''
 
-    async def add_trade(self, user_id: int, coin: str, trade_type: str, 
-                       amount: float, price: float, total_value: float):
-        """Record a trade"""
+    _APPLY_TRADE_SELL_SQL = '''
+        UPDATE users
+        SET balance = balance + $4,
+            portfolio = COALESCE(portfolio, '{}'::jsonb) - $2,
+            last_active = NOW()
+        WHERE user_id = $1
+        RETURNING balance, portfolio
+    '''
+
+    _BUMP_TRADES_BATCH_SQL = """UPDATE users SET total_trades = total_trades + v.n
+                                FROM (SELECT unnest($1::bigint[]) AS user_id,
+                                             unnest($2::int[]) AS n) v
+                                WHERE users.user_id = v.user_id"""
+
+    async def apply_trade(self, user_id: int, coin: str, trade_type: str,
+                          amount: float, price: float,
+                          total_value: float) -> Optional[Dict]:
+        """Apply a buy/sell atomically: balance and portfolio change in one
+        statement and one round trip. The informational trade row and the
+        trade counter are queued for the batch flusher.
+
+        Returns None when a buy no longer covers its cost — the statement
+        guards balance >= total_value like adjust_balance does, closing the
+        race between the handler's balance check and the debit.
+        """
+        sql = self._APPLY_TRADE_BUY_SQL if trade_type == 'BUY' else self._APPLY_TRADE_SELL_SQL
+        row = await self.pool.fetchrow(sql, user_id, coin, amount, total_value)
+        if row is None:
+            return None
+        self.add_trade(user_id, coin, trade_type, amount, price, total_value)
+        return dict(row)
+
+    def add_trade(self, user_id: int, coin: str, trade_type: str,
+                  amount: float, price: float, total_value: float):
+        """Queue a trade record; the flusher batch-inserts it shortly after.
+
+        Trade rows are informational only (balance and portfolio are already
+        updated), so trailing the trade by up to ~100 ms is fine.
+        """
+        self._trade_queue.put_nowait((user_id, coin, trade_type, amount, price, total_value))
+
+    async def _trade_flusher(self):
+        """Drain queued trade rows and write them in batches
+
+        One executemany insert plus one batched trade-counter update per burst
+        replaces two statements per trade.
+        """
+        while True:
+            rows = [await self._trade_queue.get()]
+            # Give a burst a short window to accumulate, then drain it
+            await asyncio.sleep(0.1)
+            while not self._trade_queue.empty() and len(rows) < 500:
+                rows.append(self._trade_queue.get_nowait())
+
+            try:
+                counts = Counter(row[0] for row in rows)
+                async with self.pool.acquire() as conn:
+                    await conn.executemany(self._ADD_TRADE_SQL, rows)
+                    await conn.execute(
+                        self._BUMP_TRADES_BATCH_SQL,
+                        list(counts.keys()), list(counts.values())
+                    )
+                    if self._hll_enabled:
+                        await conn.execute(self._HLL_RECORD_SQL, list(counts.keys()))
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} trade(s): {e}")
+
+    async def add_prediction(self, user_id: int, chat_id: int, coin: str, direction: str,
+                             bet_amount: float, start_price: float) -> int:
+        """Record an active prediction due in 5 minutes"""
+        return await self.pool.fetchval(
+            self._ADD_PREDICTION_SQL,
+            user_id, chat_id, coin, direction, bet_amount, start_price
+        )
+
+    async def settle_due_predictions(self) -> List[Dict]:
+        """Claim and settle every prediction whose window has closed
+
+        Rows are locked with FOR UPDATE SKIP LOCKED so concurrent settle runs
+        never double-pay, payouts are credited in one batched UPDATE, and the
+        settled rows (with result, end_price, payout and the winner's new
+        balance) are returned so the caller can notify users.
+        """
         async with self.pool.acquire() as conn:
-            await conn.execute(
-                """INSERT INTO trades (user_id, coin, trade_type, amount, price, total_value)
-                   VALUES ($1, $2, $3, $4, $5, $6)""",
-                user_id, coin, trade_type, amount, price, total_value
-            )
-            
-            # Update total trades count
-            await conn.execute(
-                "UPDATE users SET total_trades = total_trades + 1 WHERE user_id = $1",
-                user_id
-            )
+            async with conn.transaction():
+                rows = await conn.fetch(self._DUE_PREDICTIONS_SQL)
+                if not rows:
+                    return []
+
+                settled = []
+                for row in rows:
+                    bet_amount = row['bet_amount']
+                    start_price = row['start_price']
+                    end_price = price_cache.get(row['coin'])
+
+                    if end_price is None:
+                        # Price data unavailable: refund the bet
+                        result, payout, end_price = 'REFUND', bet_amount, start_price
+                    else:
+                        change = end_price - start_price
+                        won = ((row['direction'] == 'UP' and change > 0) or
+                               (row['direction'] == 'DOWN' and change < 0))
+                        result, payout = ('WIN', bet_amount * 2) if won else ('LOSS', 0.0)
+
+                    settled.append({
+                        'id': row['id'],
+                        'user_id': row['user_id'],
+                        'chat_id': row['chat_id'],
+                        'coin': row['coin'],
+                        'direction': row['direction'],
+                        'bet_amount': bet_amount,
+                        'start_price': start_price,
+                        'end_price': end_price,
+                        'result': result,
+                        'payout': payout,
+                        'new_balance': None
+                    })
+
+                credits = [s for s in settled if s['payout'] > 0]
+                if credits:
+                    # Sum per user first: the UPDATE ... FROM join applies
+                    # only one matching row per target, so a user with two
+                    # payable predictions in the batch must get one credit row
+                    payouts = Counter()
+                    for s in credits:
+                        payouts[s['user_id']] += s['payout']
+                    balances = await conn.fetch(
+                        self._CREDIT_PAYOUTS_SQL,
+                        list(payouts.keys()),
+                        list(payouts.values())
+                    )
+                    new_balances = {r['user_id']: r['balance'] for r in balances}
+                    for s in credits:
+                        s['new_balance'] = new_balances.get(s['user_id'])
+
+                await conn.execute(
+                    self._SETTLE_PREDICTIONS_SQL,
+                    [s['id'] for s in settled],
+                    [s['result'] for s in settled],
+                    [s['end_price'] for s in settled],
+                    [s['payout'] for s in settled]
+                )
+
+                return settled
 
     async def get_leaderboard(self, limit: int = 10) -> List[Dict]:
-        """Get leaderboard data"""
-        async with self.pool.acquire() as conn:
-            users = await conn.fetch(
-                """SELECT user_id, balance, portfolio, total_trades 
-                   FROM users ORDER BY balance DESC LIMIT $1""", limit
+        """Get leaderboard data, valuing portfolios inside Postgres"""
+        prices = list(price_cache.items())
+        if prices:
+            values = ', '.join(
+                f"(${i * 2 + 2}, ${i * 2 + 3}::float8)" for i in range(len(prices))
             )
-            
-            leaderboard = []
-            for user in users:
-                portfolio_value = await self.calculate_portfolio_value(
-                    json.loads(user['portfolio']) if user['portfolio'] else {}
-                )
-                total_value = float(user['balance']) + portfolio_value
-                
-                leaderboard.append({
-                    'user_id': user['user_id'],
-                    'balance': float(user['balance']),
-                    'portfolio_value': portfolio_value,
-                    'total_value': total_value,
-                    'total_trades': user['total_trades']
-                })
-            
-            return sorted(leaderboard, key=lambda x: x['total_value'], reverse=True)
+        else:
+            values = "(NULL::text, NULL::float8)"
+
+        sql = self._LEADERBOARD_SQL_TMPL.format(values=values)
+        args = [limit]
+        for coin, price in prices:
+            args.extend((coin, float(price)))
+
+        users = await self.pool.fetch(sql, *args)
+
+        return [
+            {
+                'user_id': user['user_id'],
+                'balance': user['balance'],
+                'portfolio_value': user['portfolio_value'],
+                'total_value': user['total_value'],
+                'total_trades': user['total_trades']
+            }
+            for user in users
+        ]
+
+    async def get_recent_trades(self, user_id: int) -> List:
+        """Fetch the user's most recent trades
+
+        The query string is a class constant, so asyncpg's statement cache
+        serves it without re-parsing or re-planning.
+        """
+        return await self.pool.fetch(self._RECENT_TRADES_SQL, user_id)
+
+    async def get_admin_stats(self) -> Dict:
+        """Aggregate counters for the admin dashboard, in one round-trip"""
+        sql = self._ADMIN_STATS_HLL_SQL if self._hll_enabled else self._ADMIN_STATS_SQL
+        return dict(await self.pool.fetchrow(sql))
+
+    async def get_user_stats(self, user_id: int) -> Dict:
+        """Get the user row with its portfolio valued inside Postgres"""
+        prices = list(price_cache.items())
+        if prices:
+            values = ', '.join(
+                f"(${i * 2 + 2}, ${i * 2 + 3}::float8)" for i in range(len(prices))
+            )
+        else:
+            values = "(NULL::text, NULL::float8)"
+
+        sql = self._USER_STATS_SQL_TMPL.format(values=values)
+        args = [user_id]
+        for coin, price in prices:
+            args.extend((coin, float(price)))
+
+        row = await self.pool.fetchrow(sql, *args)
+        if row is None:
+            # First contact: create the row, then value the (empty) portfolio
+            await self.get_balance(user_id)
+            row = await self.pool.fetchrow(sql, *args)
+
+        return dict(row)
 
     async def calculate_portfolio_value(self, portfolio: Dict) -> float:
         """Calculate current portfolio value"""
@@ -198,41 +707,150 @@ class DatabaseManager:
         return total_value
 
 class PriceFetcher:
+    _session: Optional[aiohttp.ClientSession] = None
+    _ws_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def get_session(cls) -> aiohttp.ClientSession:
+        """Return the shared keep-alive session, creating it on first use"""
+        if cls._session is None:
+            cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60, ttl_dns_cache=300)
+            )
+        return cls._session
+
+    @classmethod
+    async def startup(cls):
+        """Create the long-lived HTTP session and start the price stream"""
+        await cls.get_session()
+        cls._ws_task = asyncio.create_task(cls._ws_loop())
+
+    @classmethod
+    async def shutdown(cls):
+        """Stop the price stream and close the shared HTTP session"""
+        if cls._ws_task is not None:
+            cls._ws_task.cancel()
+            cls._ws_task = None
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+
+    @classmethod
+    async def _ws_loop(cls):
+        """Consume Binance miniTicker pushes and keep the price cache fresh
+
+        Each update arrives over one long-lived WebSocket instead of a polled
+        HTTP round trip; while the stream is healthy the CoinGecko fetch path
+        sees a warm cache and never fires. Reconnects with a short backoff.
+        """
+        global last_price_update
+
+        while True:
+            try:
+                session = await cls.get_session()
+                async with session.ws_connect(_BINANCE_WS_URL, heartbeat=30) as ws:
+                    logger.info("Connected to Binance price stream")
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            continue
+                        payload = orjson.loads(msg.data)['data']
+                        symbol = _BINANCE_TO_SYMBOL.get(payload['s'])
+                        if symbol:
+                            price_cache[symbol] = float(payload['c'])
+                            last_price_update = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Price stream error: {e}")
+            await asyncio.sleep(5)  # back off before reconnecting
+
     @staticmethod
-    async def fetch_prices() -> Dict[str, float]:
-        """Fetch real-time crypto prices"""
-        global price_cache, last_price_update
-        
-        current_time = time.time()
-        if current_time - last_price_update < 15:  # Cache for 15 seconds
+    def prices_stale() -> bool:
+        """Sync fast path: True only when the cache actually needs a refresh,
+        letting handlers skip scheduling the fetch coroutine entirely"""
+        return time.monotonic() - last_price_update >= 15
+
+    @classmethod
+    async def fetch_prices(cls) -> Dict[str, float]:
+        """Fetch real-time crypto prices
+
+        Concurrent callers coalesce on one in-flight refresh: the first caller
+        holds the lock and hits the API, everyone else queues on the lock and
+        then returns the freshly updated cache.
+        """
+        if time.monotonic() - last_price_update < 15:  # Cache for 15 seconds
             return price_cache
-        
+
+        async with _price_lock:
+            # Re-check: another caller may have refreshed while we waited
+            if time.monotonic() - last_price_update < 15:
+                return price_cache
+            await cls._do_fetch()
+
+        return price_cache
+
+    @classmethod
+    async def _do_fetch(cls):
+        """Hit the price API and update the cache"""
+        global price_cache, last_price_update
+
+        current_time = time.monotonic()
+
         try:
-            coin_ids = ','.join(SUPPORTED_COINS.values())
-            url = f"{COINGECKO_API}/simple/price?ids={coin_ids}&vs_currencies=usd"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Update price cache
-                        for symbol, coin_id in SUPPORTED_COINS.items():
-                            if coin_id in data:
-                                price_cache[symbol] = data[coin_id]['usd']
-                        
-                        last_price_update = current_time
-                        logger.info(f"Updated prices: {price_cache}")
-                        
+            session = await cls.get_session()
+            async with session.get(_COINGECKO_PRICE_URL,
+                                   timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+
+                    # Update price cache
+                    for coin_id, info in data.items():
+                        symbol = _ID_TO_SYMBOL.get(coin_id)
+                        if symbol:
+                            price_cache[symbol] = info['usd']
+
+                    last_price_update = current_time
+                    logger.info(f"Updated prices: {price_cache}")
+
         except Exception as e:
             logger.error(f"Error fetching prices: {e}")
-            
-        return price_cache
 
 class TradingBot:
     def __init__(self):
         self.db = DatabaseManager()
-        
+        # user_id -> (display name, monotonic timestamp); refreshed lazily with
+        # a 5-minute TTL so leaderboard renders rarely hit the Telegram API
+        self._username_cache: Dict[int, Tuple[str, float]] = {}
+        # Precomputed top-10, rebuilt by the scheduled price job so
+        # /leaderboard never runs the ranking scan on the request path
+        self._leaderboard_cache: List[Dict] = []
+        self._leaderboard_cache_ts: float = 0.0
+        self._price_task: Optional[asyncio.Task] = None
+
+    async def _resolve_usernames(self, context, user_ids: List[int]) -> Dict[int, str]:
+        """Resolve display names for user_ids, batching cache misses into one
+        concurrent round of get_chat calls."""
+        now = time.monotonic()
+        misses = [
+            uid for uid in user_ids
+            if uid not in self._username_cache
+            or now - self._username_cache[uid][1] >= 300
+        ]
+        if misses:
+            chats = await asyncio.gather(
+                *(context.bot.get_chat(uid) for uid in misses),
+                return_exceptions=True,
+            )
+            for uid, chat in zip(misses, chats):
+                if isinstance(chat, Exception):
+                    # Keep a stale entry if we have one; otherwise fall back
+                    if uid not in self._username_cache:
+                        self._username_cache[uid] = (f"User {uid}", now)
+                    continue
+                name = chat.username or chat.first_name or f"User {uid}"
+                self._username_cache[uid] = (name, now)
+        return {uid: self._username_cache[uid][0] for uid in user_ids}
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user_id = update.effective_user.id
@@ -263,7 +881,8 @@ Remember: This is FAKE money, but your regret is REAL! 😄
 
     async def prices_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show current crypto prices"""
-        await PriceFetcher.fetch_prices()
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
         
         if not price_cache:
             await update.message.reply_text("🚫 Unable to fetch prices right now. Try again later!")
@@ -282,11 +901,12 @@ Remember: This is FAKE money, but your regret is REAL! 😄
         user_id = update.effective_user.id
         user_data = await self.db.get_user(user_id)
         
-        await PriceFetcher.fetch_prices()
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
         
-        portfolio = json.loads(user_data['portfolio']) if user_data['portfolio'] else {}
+        portfolio = user_data['portfolio'] or {}
         portfolio_value = await self.db.calculate_portfolio_value(portfolio)
-        total_value = float(user_data['balance']) + portfolio_value
+        total_value = user_data['balance'] + portfolio_value
         
         portfolio_text = f"💼 **Your Portfolio** 💼\n\n"
         portfolio_text += f"💵 **Cash**: ${user_data['balance']:,.2f}\n"
@@ -308,14 +928,14 @@ Remember: This is FAKE money, but your regret is REAL! 😄
 
     def check_cooldown(self, user_id: int, command: str, cooldown_seconds: int = 3) -> bool:
         """Check if user is on cooldown"""
-        current_time = time.time()
-        user_key = f"{user_id}_{command}"
-        
-        if user_key in user_cooldowns:
-            if current_time - user_cooldowns[user_key] < cooldown_seconds:
-                return False
-        
-        user_cooldowns[user_key] = current_time
+        current_time = time.monotonic()
+        key = (user_id, command)
+
+        last_used = user_cooldowns.get(key)
+        if last_used is not None and current_time - last_used < cooldown_seconds:
+            return False
+
+        user_cooldowns[key] = current_time
         return True
 
     async def buy_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -338,41 +958,38 @@ Remember: This is FAKE money, but your regret is REAL! 😄
             return
         
         if coin not in SUPPORTED_COINS:
-            coins_list = ', '.join(SUPPORTED_COINS.keys())
-            await update.message.reply_text(f"❌ Unsupported coin! Available: {coins_list}")
+            await update.message.reply_text(UNSUPPORTED_COIN_MSG)
             return
         
         if amount <= 0:
             await update.message.reply_text("❌ Amount must be positive!")
             return
         
-        await PriceFetcher.fetch_prices()
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
         
         if coin not in price_cache:
-            await update.message.reply_text("❌ Price data unavailable. Try again later!")
+            await update.message.reply_text(PRICE_UNAVAILABLE_MSG)
             return
         
         user_data = await self.db.get_user(user_id)
-        current_balance = float(user_data['balance'])
+        current_balance = user_data['balance']
         
         if amount > current_balance:
-            await update.message.reply_text(f"❌ Insufficient funds! You have ${current_balance:,.2f}")
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
             return
         
         price = price_cache[coin]
         crypto_amount = amount / price
-        
-        # Update balance
-        new_balance = current_balance - amount
-        await self.db.update_balance(user_id, new_balance)
-        
-        # Update portfolio
-        portfolio = json.loads(user_data['portfolio']) if user_data['portfolio'] else {}
-        portfolio[coin] = portfolio.get(coin, 0) + crypto_amount
-        await self.db.update_portfolio(user_id, portfolio)
-        
-        # Record trade
-        await self.db.add_trade(user_id, coin, 'BUY', crypto_amount, price, amount)
+
+        # Apply balance, portfolio and trade record in one round trip
+        result = await self.db.apply_trade(user_id, coin, 'BUY', crypto_amount, price, amount)
+        if result is None:
+            # A concurrent command spent the balance since the check above
+            current_balance = await self.db.get_balance(user_id)
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
+            return
+        new_balance = result['balance']
         
         sarcastic_responses = [
             "Congratulations! You just bought the top! 📈",
@@ -382,16 +999,11 @@ Remember: This is FAKE money, but your regret is REAL! 😄
             "Welcome to the rollercoaster of emotions! 🎢"
         ]
         
-        response_msg = f"""
-✅ **Purchase Successful!** ✅
-
-💰 Bought: {crypto_amount:.6f} {coin}
-💵 Spent: ${amount:,.2f}
-📊 Price: ${price:,.2f}
-💳 Remaining Balance: ${new_balance:,.2f}
-
-{random.choice(sarcastic_responses)}
-        """
+        response_msg = BUY_SUCCESS_TMPL.format(
+            crypto_amount=crypto_amount, coin=coin, amount=amount,
+            price=price, new_balance=new_balance,
+            quip=_rng.choice(sarcastic_responses)
+        )
         
         await update.message.reply_text(response_msg, parse_mode='Markdown')
 
@@ -410,37 +1022,30 @@ Remember: This is FAKE money, but your regret is REAL! 😄
         coin = context.args[0].upper()
         
         if coin not in SUPPORTED_COINS:
-            coins_list = ', '.join(SUPPORTED_COINS.keys())
-            await update.message.reply_text(f"❌ Unsupported coin! Available: {coins_list}")
+            await update.message.reply_text(UNSUPPORTED_COIN_MSG)
             return
         
         user_data = await self.db.get_user(user_id)
-        portfolio = json.loads(user_data['portfolio']) if user_data['portfolio'] else {}
+        portfolio = user_data['portfolio'] or {}
         
         if coin not in portfolio or portfolio[coin] <= 0:
             await update.message.reply_text(f"❌ You don't own any {coin}!")
             return
         
-        await PriceFetcher.fetch_prices()
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
         
         if coin not in price_cache:
-            await update.message.reply_text("❌ Price data unavailable. Try again later!")
+            await update.message.reply_text(PRICE_UNAVAILABLE_MSG)
             return
         
         crypto_amount = portfolio[coin]
         price = price_cache[coin]
         sale_value = crypto_amount * price
-        
-        # Update balance
-        new_balance = float(user_data['balance']) + sale_value
-        await self.db.update_balance(user_id, new_balance)
-        
-        # Update portfolio
-        del portfolio[coin]
-        await self.db.update_portfolio(user_id, portfolio)
-        
-        # Record trade
-        await self.db.add_trade(user_id, coin, 'SELL', crypto_amount, price, sale_value)
+
+        # Apply balance, portfolio and trade record in one round trip
+        result = await self.db.apply_trade(user_id, coin, 'SELL', crypto_amount, price, sale_value)
+        new_balance = result['balance']
         
         profit_responses = [
             "Not bad! You managed to exit before total destruction! 🎯",
@@ -450,16 +1055,11 @@ Remember: This is FAKE money, but your regret is REAL! 😄
             "Timing the market? In this economy?! 📈"
         ]
         
-        response_msg = f"""
-✅ **Sale Successful!** ✅
-
-💎 Sold: {crypto_amount:.6f} {coin}
-💵 Received: ${sale_value:,.2f}
-📊 Price: ${price:,.2f}
-💳 New Balance: ${new_balance:,.2f}
-
-{random.choice(profit_responses)}
-        """
+        response_msg = SELL_SUCCESS_TMPL.format(
+            crypto_amount=crypto_amount, coin=coin, sale_value=sale_value,
+            price=price, new_balance=new_balance,
+            quip=_rng.choice(profit_responses)
+        )
         
         await update.message.reply_text(response_msg, parse_mode='Markdown')
 
@@ -478,41 +1078,32 @@ Remember: This is FAKE money, but your regret is REAL! 😄
         try:
             bet_amount = float(context.args[0])
         except ValueError:
-            await update.message.reply_text("❌ Invalid amount!")
+            await update.message.reply_text(INVALID_AMOUNT_MSG)
             return
         
         if bet_amount <= 0:
-            await update.message.reply_text("❌ Bet amount must be positive!")
+            await update.message.reply_text(POSITIVE_BET_MSG)
             return
         
-        user_data = await self.db.get_user(user_id)
-        current_balance = float(user_data['balance'])
-        
-        if bet_amount > current_balance:
-            await update.message.reply_text(f"❌ Insufficient funds! You have ${current_balance:,.2f}")
+        # Flip the coin first, then settle the bet in one atomic statement
+        won = _rng.getrandbits(1) == 1
+        delta = bet_amount if won else -bet_amount
+
+        new_balance = await self.db.adjust_balance(user_id, delta, stake=bet_amount)
+        if new_balance is None:
+            current_balance = await self.db.get_balance(user_id)
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
             return
-        
-        # Flip the coin
-        won = random.random() < 0.5
-        
+
         if won:
-            new_balance = current_balance + bet_amount
             result_msg = f"🪙 **HEADS!** You win ${bet_amount * 2:,.2f}! 🎉"
         else:
-            new_balance = current_balance - bet_amount
             result_msg = f"🪙 **TAILS!** You lost ${bet_amount:,.2f}! 💸"
         
-        await self.db.update_balance(user_id, new_balance)
-        
-        flip_msg = f"""
-🪙 **COIN FLIP** 🪙
-
-💰 Bet: ${bet_amount:,.2f}
-{result_msg}
-💳 New Balance: ${new_balance:,.2f}
-
-{'Lady Luck smiles upon you!' if won else 'Better luck next time, gambler!'}
-        """
+        flip_msg = COINFLIP_TMPL.format(
+            bet_amount=bet_amount, result_msg=result_msg, new_balance=new_balance,
+            quip='Lady Luck smiles upon you!' if won else 'Better luck next time, gambler!'
+        )
         
         await update.message.reply_text(flip_msg, parse_mode='Markdown')
 
@@ -531,27 +1122,18 @@ Remember: This is FAKE money, but your regret is REAL! 😄
         try:
             bet_amount = float(context.args[0])
         except ValueError:
-            await update.message.reply_text("❌ Invalid amount!")
+            await update.message.reply_text(INVALID_AMOUNT_MSG)
             return
         
         if bet_amount <= 0:
-            await update.message.reply_text("❌ Bet amount must be positive!")
-            return
-        
-        user_data = await self.db.get_user(user_id)
-        current_balance = float(user_data['balance'])
-        
-        if bet_amount > current_balance:
-            await update.message.reply_text(f"❌ Insufficient funds! You have ${current_balance:,.2f}")
+            await update.message.reply_text(POSITIVE_BET_MSG)
             return
         
         # Slot symbols
         symbols = ['🍒', '🍋', '🍊', '🍇', '🔔', '💎', '7️⃣']
         
-        # Spin the reels
-        reel1 = random.choice(symbols)
-        reel2 = random.choice(symbols)
-        reel3 = random.choice(symbols)
+        # Spin the reels in one draw
+        reel1, reel2, reel3 = _rng.choices(symbols, k=3)
         
         # Calculate winnings
         if reel1 == reel2 == reel3:
@@ -567,26 +1149,26 @@ Remember: This is FAKE money, but your regret is REAL! 😄
             multiplier = 0
         
         winnings = bet_amount * multiplier
-        new_balance = current_balance - bet_amount + winnings
-        
-        await self.db.update_balance(user_id, new_balance)
-        
+
+        # Settle the spin in one atomic statement
+        new_balance = await self.db.adjust_balance(
+            user_id, winnings - bet_amount, stake=bet_amount
+        )
+        if new_balance is None:
+            current_balance = await self.db.get_balance(user_id)
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
+            return
+
         if multiplier > 0:
             result_msg = f"🎉 You won ${winnings:,.2f}! (x{multiplier})"
         else:
             result_msg = f"💸 You lost ${bet_amount:,.2f}!"
-        
-        slots_msg = f"""
-🎰 **SLOT MACHINE** 🎰
-
-{reel1} | {reel2} | {reel3}
 
-💰 Bet: ${bet_amount:,.2f}
-{result_msg}
-💳 New Balance: ${new_balance:,.2f}
-
-{'Jackpot vibes!' if multiplier >= 10 else 'The house always wins... eventually!' if multiplier == 0 else 'Small wins count too!'}
-        """
+        slots_msg = SLOTS_TMPL.format(
+            reel1=reel1, reel2=reel2, reel3=reel3, bet_amount=bet_amount,
+            result_msg=result_msg, new_balance=new_balance,
+            quip='Jackpot vibes!' if multiplier >= 10 else 'The house always wins... eventually!' if multiplier == 0 else 'Small wins count too!'
+        )
         
         await update.message.reply_text(slots_msg, parse_mode='Markdown')
 
@@ -608,12 +1190,11 @@ Remember: This is FAKE money, but your regret is REAL! 😄
         try:
             bet_amount = float(context.args[2])
         except ValueError:
-            await update.message.reply_text("❌ Invalid amount!")
+            await update.message.reply_text(INVALID_AMOUNT_MSG)
             return
         
         if coin not in SUPPORTED_COINS:
-            coins_list = ', '.join(SUPPORTED_COINS.keys())
-            await update.message.reply_text(f"❌ Unsupported coin! Available: {coins_list}")
+            await update.message.reply_text(UNSUPPORTED_COIN_MSG)
             return
         
         if direction not in ['UP', 'DOWN']:
@@ -621,137 +1202,71 @@ Remember: This is FAKE money, but your regret is REAL! 😄
             return
         
         if bet_amount <= 0:
-            await update.message.reply_text("❌ Bet amount must be positive!")
-            return
-        
-        user_data = await self.db.get_user(user_id)
-        current_balance = float(user_data['balance'])
-        
-        if bet_amount > current_balance:
-            await update.message.reply_text(f"❌ Insufficient funds! You have ${current_balance:,.2f}")
+            await update.message.reply_text(POSITIVE_BET_MSG)
             return
         
-        await PriceFetcher.fetch_prices()
-        
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
+
         if coin not in price_cache:
-            await update.message.reply_text("❌ Price data unavailable. Try again later!")
+            await update.message.reply_text(PRICE_UNAVAILABLE_MSG)
             return
-        
+
         start_price = price_cache[coin]
-        
-        # Deduct bet amount immediately
-        new_balance = current_balance - bet_amount
-        await self.db.update_balance(user_id, new_balance)
-        
-        prediction_msg = f"""
-🔮 **PRICE PREDICTION ACTIVE** 🔮
 
-💰 Coin: {coin}
-📊 Current Price: ${start_price:,.2f}
-🎯 Prediction: {direction}
-💵 Bet: ${bet_amount:,.2f}
+        # Deduct the bet in one atomic statement
+        new_balance = await self.db.adjust_balance(user_id, -bet_amount, stake=bet_amount)
+        if new_balance is None:
+            current_balance = await self.db.get_balance(user_id)
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
+            return
 
-⏰ Check back in 5 minutes to see if you won!
-Use /checkprediction to see the result.
+        # Persist the prediction; the repeating settle job picks it up when due
+        await self.db.add_prediction(
+            user_id, update.effective_chat.id, coin, direction, bet_amount, start_price
+        )
 
-Fortune favors the bold... or does it? 🤔
-        """
-        
-        # Store prediction (in a real implementation, you'd store this in the database)
-        prediction_key = f"prediction_{user_id}_{int(time.time())}"
-        context.bot_data[prediction_key] = {
-            'user_id': user_id,
-            'coin': coin,
-            'direction': direction,
-            'bet_amount': bet_amount,
-            'start_price': start_price,
-            'start_time': time.time()
-        }
-        
-        await update.message.reply_text(prediction_msg, parse_mode='Markdown')
-        
-        # Set a timer to resolve the prediction after 5 minutes
-        context.job_queue.run_once(
-            self.resolve_prediction,
-            300,  # 5 minutes
-            data={'prediction_key': prediction_key, 'chat_id': update.effective_chat.id}
+        prediction_msg = PREDICTION_ACTIVE_TMPL.format(
+            coin=coin, start_price=start_price, direction=direction, bet_amount=bet_amount
         )
 
-    async def resolve_prediction(self, context: ContextTypes.DEFAULT_TYPE):
-        """Resolve a price prediction"""
-        prediction_key = context.job.data['prediction_key']
-        chat_id = context.job.data['chat_id']
-        
-        if prediction_key not in context.bot_data:
-            return
-        
-        prediction = context.bot_data[prediction_key]
-        user_id = prediction['user_id']
-        coin = prediction['coin']
-        direction = prediction['direction']
-        bet_amount = prediction['bet_amount']
-        start_price = prediction['start_price']
-        
-        # Fetch current price
-        await PriceFetcher.fetch_prices()
-        
-        if coin not in price_cache:
-            # Refund if price unavailable
-            user_data = await self.db.get_user(user_id)
-            current_balance = float(user_data['balance'])
-            await self.db.update_balance(user_id, current_balance + bet_amount)
-            
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text=f"🔮 Prediction refunded due to price data unavailability. ${bet_amount:,.2f} returned."
-            )
-            del context.bot_data[prediction_key]
-            return
-        
-        end_price = price_cache[coin]
-        price_change = end_price - start_price
-        
-        # Determine if prediction was correct
-        if (direction == 'UP' and price_change > 0) or (direction == 'DOWN' and price_change < 0):
-            # Won!
-            winnings = bet_amount * 2
-            user_data = await self.db.get_user(user_id)
-            current_balance = float(user_data['balance'])
-            new_balance = current_balance + winnings
-            await self.db.update_balance(user_id, new_balance)
-            
-            result_msg = f"""
-🎉 **PREDICTION WON!** 🎉
+        await update.message.reply_text(prediction_msg, parse_mode='Markdown')
 
-💰 {coin}: ${start_price:,.2f} → ${end_price:,.2f}
-📈 Change: {'+' if price_change > 0 else ''}${price_change:,.2f}
-🎯 Your Prediction: {direction} ✅
-💵 Winnings: ${winnings:,.2f}
-💳 New Balance: ${new_balance:,.2f}
+    async def resolve_due_predictions(self, context: ContextTypes.DEFAULT_TYPE):
+        """Settle every prediction whose 5-minute window has closed"""
+        # Make sure settlement prices are fresh
+        if PriceFetcher.prices_stale():
+            await PriceFetcher.fetch_prices()
 
-You're either psychic or lucky! 🔮
-            """
-        else:
-            # Lost
-            result_msg = f"""
-💸 **PREDICTION LOST** 💸
+        settled = await self.db.settle_due_predictions()
+        if not settled:
+            return
 
-💰 {coin}: ${start_price:,.2f} → ${end_price:,.2f}
-📉 Change: {'+' if price_change > 0 else ''}${price_change:,.2f}
-🎯 Your Prediction: {direction} ❌
-💸 Lost: ${bet_amount:,.2f}
+        notifications = []
+        for s in settled:
+            if s['result'] == 'REFUND':
+                result_msg = PREDICTION_REFUND_TMPL.format(bet_amount=s['bet_amount'])
+            else:
+                price_change = s['end_price'] - s['start_price']
+                tmpl = PREDICTION_WON_TMPL if s['result'] == 'WIN' else PREDICTION_LOST_TMPL
+                result_msg = tmpl.format(
+                    coin=s['coin'], start_price=s['start_price'], end_price=s['end_price'],
+                    change_sign='+' if price_change > 0 else '', price_change=price_change,
+                    direction=s['direction'], payout=s['payout'],
+                    new_balance=s['new_balance'], bet_amount=s['bet_amount']
+                )
 
-The market is a harsh teacher! 📚
-            """
-        
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=result_msg,
-            parse_mode='Markdown'
-        )
-        
-        # Clean up
-        del context.bot_data[prediction_key]
+            notifications.append(context.bot.send_message(
+                chat_id=s['chat_id'],
+                text=result_msg,
+                parse_mode='Markdown'
+            ))
+
+        # Deliver results concurrently; a blocked chat must not stall the rest
+        results = await asyncio.gather(*notifications, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error sending prediction result: {result}")
 
     async def roll_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle dice roll gambling"""
@@ -768,22 +1283,15 @@ The market is a harsh teacher! 📚
         try:
             bet_amount = float(context.args[0])
         except ValueError:
-            await update.message.reply_text("❌ Invalid amount!")
+            await update.message.reply_text(INVALID_AMOUNT_MSG)
             return
         
         if bet_amount <= 0:
-            await update.message.reply_text("❌ Bet amount must be positive!")
-            return
-        
-        user_data = await self.db.get_user(user_id)
-        current_balance = float(user_data['balance'])
-        
-        if bet_amount > current_balance:
-            await update.message.reply_text(f"❌ Insufficient funds! You have ${current_balance:,.2f}")
+            await update.message.reply_text(POSITIVE_BET_MSG)
             return
         
         # Roll the dice (1-100)
-        roll = random.randint(1, 100)
+        roll = _rng.randrange(1, 101)
         
         # Calculate multiplier based on roll
         if roll >= 95:
@@ -798,116 +1306,104 @@ The market is a harsh teacher! 📚
             multiplier = 0
         
         winnings = bet_amount * multiplier
-        new_balance = current_balance - bet_amount + winnings
-        
-        await self.db.update_balance(user_id, new_balance)
-        
+
+        # Settle the roll in one atomic statement
+        new_balance = await self.db.adjust_balance(
+            user_id, winnings - bet_amount, stake=bet_amount
+        )
+        if new_balance is None:
+            current_balance = await self.db.get_balance(user_id)
+            await update.message.reply_text(INSUFFICIENT_FUNDS_TMPL.format(balance=current_balance))
+            return
+
         if multiplier > 0:
             result_msg = f"🎉 You won ${winnings:,.2f}! (x{multiplier})"
         else:
             result_msg = f"💸 You lost ${bet_amount:,.2f}!"
+
+        roll_msg = ROLL_TMPL.format(
+            roll=roll, bet_amount=bet_amount, result_msg=result_msg, new_balance=new_balance,
+            quip='Incredible luck!' if roll >= 95 else 'Great roll!' if roll >= 85 else 'Not bad!' if roll >= 70 else 'Close!' if roll >= 50 else 'Ouch! Try again!'
+        )
         
-        roll_msg = f"""
-🎲 **DICE ROLL** 🎲
+        await update.message.reply_text(roll_msg, parse_mode='Markdown')
 
-🎯 Roll: {roll}/100
-💰 Bet: ${bet_amount:,.2f}
-{result_msg}
-💳 New Balance: ${new_balance:,.2f}
+    async def refresh_leaderboard(self):
+        """Rebuild the cached top-10 ranking"""
+        self._leaderboard_cache = await self.db.get_leaderboard(10)
+        self._leaderboard_cache_ts = time.monotonic()
+
+    async def price_loop(self):
+        """Background loop: REST fallback price fetch plus leaderboard rebuild
 
-{'Incredible luck!' if roll >= 95 else 'Great roll!' if roll >= 85 else 'Not bad!' if roll >= 70 else 'Close!' if roll >= 50 else 'Ouch! Try again!'}
+        A plain task instead of a JobQueue job — one repeating timer doesn't
+        need APScheduler behind it.
         """
-        
-        await update.message.reply_text(roll_msg, parse_mode='Markdown')
+        while True:
+            await asyncio.sleep(30)
+            try:
+                await PriceFetcher.fetch_prices()
+                await self.refresh_leaderboard()
+            except Exception as e:
+                logger.error(f"Error in price refresh loop: {e}")
 
     async def leaderboard_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show leaderboard"""
-        leaderboard_data = await self.db.get_leaderboard(10)
-        
+        # Served from the cache rebuilt by the price job; only recompute here
+        # if the job has somehow not run for a minute
+        if time.monotonic() - self._leaderboard_cache_ts >= 60:
+            await self.refresh_leaderboard()
+        leaderboard_data = self._leaderboard_cache
+
         if not leaderboard_data:
             await update.message.reply_text("📊 No players yet! Be the first to start trading!")
             return
         
-        leaderboard_text = "🏆 **TOP FAKE CRYPTO MILLIONAIRES** 🏆\n\n"
-        
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, player in enumerate(leaderboard_data):
-            rank_emoji = medals[i] if i < 3 else f"{i+1}."
-            
-            # Get username (in a real bot, you'd fetch this from Telegram API)
-            username = f"User {player['user_id']}"
-            
-            leaderboard_text += f"{rank_emoji} **{username}**\n"
-            leaderboard_text += f"💎 Net Worth: ${player['total_value']:,.2f}\n"
-            leaderboard_text += f"💵 Cash: ${player['balance']:,.2f}\n"
-            leaderboard_text += f"📈 Crypto: ${player['portfolio_value']:,.2f}\n"
-            leaderboard_text += f"📊 Trades: {player['total_trades']}\n\n"
-        
-        leaderboard_text += "💡 Rankings update in real-time!"
-        
-        await update.message.reply_text(leaderboard_text, parse_mode='Markdown')
+        usernames = await self._resolve_usernames(
+            context, [player['user_id'] for player in leaderboard_data]
+        )
 
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show help message"""
-        help_text = """
-🎮 **Fake Crypto World Commands** 🎮
+        parts = [LEADERBOARD_HEADER]
 
-**📈 Trading:**
-/prices - Current market prices
-/buy <COIN> <AMOUNT> - Buy crypto (e.g., /buy BTC 1000)
-/sell <COIN> - Sell all of a coin (e.g., /sell ETH)
-/portfolio - View your holdings
-
-**🎲 Gambling:**
-/coinflip <AMOUNT> - 50/50 chance, double or nothing
-/slots <AMOUNT> - 3-reel slot machine
-/predict <COIN> <UP/DOWN> <AMOUNT> - Predict price in 5min
-/roll <AMOUNT> - Roll 1-100, higher = better rewards
+        for i, player in enumerate(leaderboard_data):
+            rank_emoji = RANK_LABELS[i]
+            username = usernames[player['user_id']]
 
-**📊 Stats:**
-/leaderboard - Top 10 players by net worth
-/help - Show this message
+            parts.append(
+                f"{rank_emoji} **{username}**\n"
+                f"💎 Net Worth: ${player['total_value']:,.2f}\n"
+                f"💵 Cash: ${player['balance']:,.2f}\n"
+                f"📈 Crypto: ${player['portfolio_value']:,.2f}\n"
+                f"📊 Trades: {player['total_trades']}\n\n"
+            )
 
-**💰 Supported Coins:**
-BTC, ETH, SOL, ADA, DOT, AVAX, MATIC, LINK, UNI, ATOM
+        parts.append(LEADERBOARD_FOOTER)
 
-**🎯 Gambling Payouts:**
-• Coin Flip: 2x (50% chance)
-• Slots: 2x-50x depending on match
-• Prediction: 2x if correct
-• Dice: 2x-10x based on roll (50+ to win)
+        await update.message.reply_text("".join(parts), parse_mode='Markdown')
 
-Remember: All money is FAKE! Trade responsibly! 😄
-        """
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show help message"""
+        await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
 
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show user statistics"""
         user_id = update.effective_user.id
         
-        async with self.db.pool.acquire() as conn:
-            # Get user basic stats
-            user_data = await self.db.get_user(user_id)
-            
-            # Get trade history
-            trades = await conn.fetch(
-                "SELECT * FROM trades WHERE user_id = $1 ORDER BY timestamp DESC LIMIT 10",
-                user_id
-            )
-            
-            # Calculate portfolio value
-            portfolio = json.loads(user_data['portfolio']) if user_data['portfolio'] else {}
-            portfolio_value = await self.db.calculate_portfolio_value(portfolio)
-            total_value = float(user_data['balance']) + portfolio_value
-            
-            # Calculate profit/loss
-            starting_balance = 10000.0
-            profit_loss = total_value - starting_balance
-            profit_percentage = (profit_loss / starting_balance) * 100
-            
-            stats_text = f"""
+        # User row with the portfolio already valued server-side
+        user_data = await self.db.get_user_stats(user_id)
+
+        # Get trade history
+        trades = await self.db.get_recent_trades(user_id)
+
+        portfolio_value = user_data['portfolio_value']
+        total_value = user_data['balance'] + portfolio_value
+
+        # Calculate profit/loss
+        starting_balance = 10000.0
+        profit_loss = total_value - starting_balance
+        profit_percentage = (profit_loss / starting_balance) * 100
+
+        parts = [f"""
 📊 **Your Trading Statistics** 📊
 
 💎 **Net Worth**: ${total_value:,.2f}
@@ -919,59 +1415,49 @@ Remember: All money is FAKE! Trade responsibly! 😄
 📅 **Member Since**: {user_data['join_date'].strftime('%Y-%m-%d')}
 
 **📈 Recent Trades:**
-            """
-            
-            if trades:
-                for trade in trades[:5]:
-                    action = "📈 Bought" if trade['trade_type'] == 'BUY' else "📉 Sold"
-                    stats_text += f"{action} {trade['amount']:.4f} {trade['coin']} @ ${trade['price']:,.2f}\n"
-            else:
-                stats_text += "No trades yet! Start with /buy or /sell"
-        
-        await update.message.reply_text(stats_text, parse_mode='Markdown')
+            """]
+
+        if trades:
+            parts.extend(
+                f"{TRADE_EMOJI[t['trade_type']]} {t['amount']:.4f} {t['coin']} @ ${t['price']:,.2f}\n"
+                for t in trades
+            )
+        else:
+            parts.append("No trades yet! Start with /buy or /sell")
+
+        await update.message.reply_text("".join(parts), parse_mode='Markdown')
 
 # Admin commands (for bot owner)
 class AdminCommands:
     def __init__(self, db: DatabaseManager):
         self.db = db
-        self.admin_ids = {123456789}  # Add your Telegram user ID here
-    
+
     def is_admin(self, user_id: int) -> bool:
-        return user_id in self.admin_ids
+        return user_id in ADMIN_IDS
     
     async def admin_stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show bot statistics (admin only)"""
         if not self.is_admin(update.effective_user.id):
             return
         
-        async with self.db.pool.acquire() as conn:
-            # Total users
-            total_users = await conn.fetchval("SELECT COUNT(*) FROM users")
-            
-            # Total trades
-            total_trades = await conn.fetchval("SELECT COUNT(*) FROM trades")
-            
-            # Active users (traded in last 24h)
-            active_users = await conn.fetchval(
-                "SELECT COUNT(DISTINCT user_id) FROM trades WHERE timestamp > NOW() - INTERVAL '24 hours'"
-            )
-            
-            # Total money in circulation
-            total_balance = await conn.fetchval("SELECT SUM(balance) FROM users")
-            
-            admin_text = f"""
+        stats = await self.db.get_admin_stats()
+
+        admin_text = f"""
 🔧 **Bot Admin Statistics** 🔧
 
-👥 **Total Users**: {total_users:,}
-📊 **Total Trades**: {total_trades:,}
-🔥 **Active Users (24h)**: {active_users:,}
-💰 **Total Fake Money**: ${float(total_balance or 0):,.2f}
+👥 **Total Users**: {stats['total_users']:,}
+📊 **Total Trades**: {stats['total_trades']:,}
+🔥 **Active Users (24h)**: {stats['active_users']:,}
+💰 **Total Fake Money**: ${stats['total_balance'] or 0:,.2f}
 
 **📈 Price Cache Status:**
 {len(price_cache)} coins cached
-Last update: {time.time() - last_price_update:.1f}s ago
+Last update: {time.monotonic() - last_price_update:.1f}s ago
+
+**🗄 DB Pool:**
+{self.db.pool.get_size()} connections ({self.db.pool.get_idle_size()} idle)
             """
-        
+
         await update.message.reply_text(admin_text, parse_mode='Markdown')
 
 # Error handler
@@ -979,51 +1465,89 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
     """Log errors caused by Updates."""
     logger.error(f"Update {update} caused error {context.error}")
 
-# Job to update prices periodically
-async def update_prices_job(context: ContextTypes.DEFAULT_TYPE):
-    """Periodic job to update prices"""
-    await PriceFetcher.fetch_prices()
-    logger.info("Prices updated via scheduled job")
-
 def main():
     """Start the bot"""
+
     # Create bot instance
     bot = TradingBot()
     admin = AdminCommands(bot.db)
     
+    async def post_init(app):
+        # Runs on the application's own loop, so the pool and the price
+        # stream live where the handlers do
+        await bot.db.init_db()
+        await PriceFetcher.startup()
+        # Initial price fetch
+        await PriceFetcher.fetch_prices()
+        bot._price_task = asyncio.create_task(bot.price_loop())
+
+    async def post_shutdown(app):
+        if bot._price_task is not None:
+            bot._price_task.cancel()
+            bot._price_task = None
+        await PriceFetcher.shutdown()
+
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
-    
-    # Initialize database
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(bot.db.init_db())
-    
-    # Add handlers
-    application.add_handler(CommandHandler("start", bot.start_command))
-    application.add_handler(CommandHandler("help", bot.help_command))
-    application.add_handler(CommandHandler("prices", bot.prices_command))
-    application.add_handler(CommandHandler("portfolio", bot.portfolio_command))
-    application.add_handler(CommandHandler("buy", bot.buy_command))
-    application.add_handler(CommandHandler("sell", bot.sell_command))
-    application.add_handler(CommandHandler("coinflip", bot.coinflip_command))
-    application.add_handler(CommandHandler("slots", bot.slots_command))
-    application.add_handler(CommandHandler("predict", bot.predict_command))
-    application.add_handler(CommandHandler("roll", bot.roll_command))
-    application.add_handler(CommandHandler("leaderboard", bot.leaderboard_command))
-    application.add_handler(CommandHandler("stats", bot.stats_command))
-    
-    # Admin commands
-    application.add_handler(CommandHandler("adminstats", admin.admin_stats_command))
-    
+    # concurrent_updates: a slow handler in one chat must not stall the others.
+    # Shared mutables (price_cache, user_cooldowns) are safe — handlers never
+    # await between reading and writing them, and price refreshes serialize on
+    # _price_lock.
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(256)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+
+
+    # One dispatch table instead of a CommandHandler per command: PTB walks
+    # its handler list per update, so a dict lookup replaces up to thirteen
+    # sequential filter checks
+    commands = {
+        'start': bot.start_command,
+        'help': bot.help_command,
+        'prices': bot.prices_command,
+        'portfolio': bot.portfolio_command,
+        'buy': bot.buy_command,
+        'sell': bot.sell_command,
+        'coinflip': bot.coinflip_command,
+        'slots': bot.slots_command,
+        'predict': bot.predict_command,
+        'roll': bot.roll_command,
+        'leaderboard': bot.leaderboard_command,
+        'stats': bot.stats_command,
+        'adminstats': admin.admin_stats_command,
+    }
+
+    async def dispatch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route /commands through the dict, mirroring CommandHandler's
+        handling of the /cmd@botname form and of context.args"""
+        # filters.COMMAND also matches edited messages and channel posts,
+        # where update.message is None
+        message = update.effective_message
+        if message is None or not message.text:
+            return
+        tokens = message.text.split()
+        name, _, mention = tokens[0][1:].partition('@')
+        if mention and mention.lower() != context.bot.username.lower():
+            return  # addressed to a different bot
+        handler = commands.get(name.lower())
+        if handler is None:
+            return  # unknown command: same silence as an unmatched handler
+        context.args = tokens[1:]
+        await handler(update, context)
+
+    application.add_handler(MessageHandler(filters.COMMAND, dispatch_command))
+
+
     # Error handler
     application.add_error_handler(error_handler)
     
-    # Schedule price updates every 30 seconds
+    # Settle due predictions in batches every 10 seconds
     job_queue = application.job_queue
-    job_queue.run_repeating(update_prices_job, interval=30, first=10)
-    
-    # Initial price fetch
-    loop.run_until_complete(PriceFetcher.fetch_prices())
+    job_queue.run_repeating(bot.resolve_due_predictions, interval=10, first=10)
     
     logger.info("Bot is starting...")
     